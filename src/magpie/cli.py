@@ -1,62 +1,114 @@
 from __future__ import annotations
 
+import argparse
 import logging
+import os
+import sys
 from pathlib import Path
-
-import typer
-
-from .steps.install_picrust2_ref import install_picrust2_ref_step
-from .steps.validate import validate_step
-from .steps.prep import prep_step
-from .steps.gtdbtk import gtdbtk_step
-from .steps.taxonomy import taxonomy_step
-from .steps.qc import qc_step
-from .steps.barrnap import barrnap_step
-from .steps.rrna import rrna_step
-from .steps.align import align_step
-from .steps.choose_best import choose_best_step
-from .steps.raxml_check import raxml_check_step
-from .steps.iqtree import iqtree_step
-from .steps.raxml_evaluate import raxml_evaluate_step
-from .steps.hmm_prep import hmm_prep_step
-from .steps.hmm_build import hmm_build_step
-from .steps.package_ref import package_ref_step
-from .steps.ko_table import ko_table_step
-from .steps.ec_table import ec_table_step
-
-app = typer.Typer(
-    no_args_is_help=True,
-    add_completion=False,
-    help="MAGPIE: build components of a custom PICRUSt2 reference database from MAGs.",
-)
+from typing import Any, Callable, Final, Sequence
 
 _LOGGER = logging.getLogger("magpie")
+_ROOT_LOGGER = logging.getLogger()
+
+_LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+_LOG_CONFIGURED = False
+
+_DESCRIPTION = "MAGPIE: build components of a custom PICRUSt2 reference database from MAGs."
+
+
+class BadParameter(ValueError):
+    """Invalid combination of command-line options; reported as a usage error."""
 
 
 def _configure_logging(verbose: bool, debug: bool) -> None:
+    global _LOG_CONFIGURED
+
+    # Default (WARNING) path: no handler/formatter setup needed.
+    if not verbose and not debug and not _LOG_CONFIGURED:
+        _ROOT_LOGGER.setLevel(logging.WARNING)
+        return
+
     level = logging.WARNING
     if verbose:
         level = logging.INFO
     if debug:
         level = logging.DEBUG
 
-    root = logging.getLogger()
-    if not root.handlers:
-        logging.basicConfig(
-            level=level,
-            format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        )
+    if not _ROOT_LOGGER.handlers:
+        logging.basicConfig(level=level, format=_LOG_FORMAT)
     else:
-        root.setLevel(level)
+        _ROOT_LOGGER.setLevel(level)
+    _LOG_CONFIGURED = True
 
 
-@app.callback()
-def main(
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable INFO-level logging."),
-    debug: bool = typer.Option(False, "--debug", help="Enable DEBUG-level logging (very noisy)."),
-) -> None:
-    _configure_logging(verbose=verbose, debug=debug)
-    _LOGGER.debug("Logging configured (verbose=%s, debug=%s).", verbose, debug)
+def _dir_in(value: str) -> Path:
+    """Existing, readable directory (resolved)."""
+    p = Path(value).resolve()
+    if not p.exists():
+        raise argparse.ArgumentTypeError(f"Directory '{value}' does not exist.")
+    if not p.is_dir():
+        raise argparse.ArgumentTypeError(f"Directory '{value}' is a file.")
+    if not os.access(p, os.R_OK):
+        raise argparse.ArgumentTypeError(f"Directory '{value}' is not readable.")
+    return p
+
+
+def _file_in(value: str) -> Path:
+    """Existing, readable file (resolved)."""
+    p = Path(value).resolve()
+    if not p.exists():
+        raise argparse.ArgumentTypeError(f"File '{value}' does not exist.")
+    if p.is_dir():
+        raise argparse.ArgumentTypeError(f"File '{value}' is a directory.")
+    if not os.access(p, os.R_OK):
+        raise argparse.ArgumentTypeError(f"File '{value}' is not readable.")
+    return p
+
+
+def _dir_out(value: str) -> Path:
+    """Output directory (resolved); may not exist yet, but must not be a file."""
+    p = Path(value).resolve()
+    if p.exists() and not p.is_dir():
+        raise argparse.ArgumentTypeError(f"Directory '{value}' is a file.")
+    return p
+
+
+def _int_range(lo: int, hi: int | None = None) -> Callable[[str], int]:
+    def parse(value: str) -> int:
+        try:
+            v = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{value}' is not a valid integer.") from None
+        if v < lo or (hi is not None and v > hi):
+            bounds = f">={lo}" if hi is None else f"{lo}<=x<={hi}"
+            raise argparse.ArgumentTypeError(f"{v} is not in the range {bounds}.")
+        return v
+
+    return parse
+
+
+def _float_range(lo: float, hi: float) -> Callable[[str], float]:
+    def parse(value: str) -> float:
+        try:
+            v = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{value}' is not a valid float.") from None
+        if not lo <= v <= hi:
+            raise argparse.ArgumentTypeError(f"{v} is not in the range {lo}<=x<={hi}.")
+        return v
+
+    return parse
+
+
+def _log_noop(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+# Shared add_argument() specs for the path options repeated across commands.
+_DIR_IN: Final[dict[str, Any]] = {"type": _dir_in, "required": True}
+_DIR_IN_OPT: Final[dict[str, Any]] = {"type": _dir_in, "default": None}
+_DIR_OUT: Final[dict[str, Any]] = {"type": _dir_out, "required": True}
+_FILE_IN_OPT: Final[dict[str, Any]] = {"type": _file_in, "default": None}
 
 
 def _validate_checkm_reuse_args(
@@ -68,110 +120,172 @@ def _validate_checkm_reuse_args(
 ) -> None:
     if checkm_results is not None:
         if checkm_qa is not None or checkm_qa_bacteria is not None or checkm_qa_archaea is not None:
-            raise typer.BadParameter("Use either --checkm-results (legacy) OR CheckM QA options, not both.")
+            raise BadParameter("Use either --checkm-results (legacy) OR CheckM QA options, not both.")
 
     if checkm_qa is not None:
         if checkm_qa_bacteria is not None or checkm_qa_archaea is not None:
-            raise typer.BadParameter("Use either --checkm-qa OR --checkm-qa-bacteria/--checkm-qa-archaea, not both.")
+            raise BadParameter("Use either --checkm-qa OR --checkm-qa-bacteria/--checkm-qa-archaea, not both.")
 
     if (checkm_qa_bacteria is None) ^ (checkm_qa_archaea is None):
-        raise typer.BadParameter("Provide both --checkm-qa-bacteria and --checkm-qa-archaea together.")
+        raise BadParameter("Provide both --checkm-qa-bacteria and --checkm-qa-archaea together.")
 
 
-@app.command("run")
-def cmd_run(
-    mags: Path = typer.Option(..., "--mags", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    out: Path = typer.Option(..., "--out", file_okay=False, dir_okay=True, resolve_path=True),
+def _add_run_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--mags", **_DIR_IN)
+    p.add_argument("--out", **_DIR_OUT)
 
-    rename_map: Path | None = typer.Option(None, "--rename-map", exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
-    sequential_ids: bool = typer.Option(False, "--sequential-ids/--no-sequential-ids"),
-    out_prefix: str = typer.Option("MAG", "--out-prefix"),
-    pad: int = typer.Option(4, "--pad", min=1, max=12),
+    p.add_argument("--rename-map", **_FILE_IN_OPT)
+    p.add_argument("--sequential-ids", action=argparse.BooleanOptionalAction, default=False)
+    p.add_argument("--out-prefix", default="MAG")
+    p.add_argument("--pad", type=_int_range(1, 12), default=4)
 
-    gtdb_classify: Path | None = typer.Option(
-        None,
+    p.add_argument(
         "--gtdb-classify",
-        exists=True,
-        file_okay=False,
-        dir_okay=True,
-        readable=True,
-        resolve_path=True,
+        **_DIR_IN_OPT,
         help="Path to an existing GTDB-Tk classify/ directory. If provided, GTDB-Tk is skipped.",
-    ),
-    cpus: int = typer.Option(8, "--cpus", min=1, help="CPUs for external tools."),
+    )
+    p.add_argument("--cpus", type=_int_range(1), default=8, help="CPUs for external tools.")
 
-    move_tax_split: bool = typer.Option(False, "--move-tax-split"),
+    p.add_argument("--move-tax-split", action="store_true")
 
-    skip_qc: bool = typer.Option(False, "--skip-qc", help="Stop after taxonomy."),
+    p.add_argument("--skip-qc", action="store_true", help="Stop after taxonomy.")
 
-    checkm_qa: Path | None = typer.Option(None, "--checkm-qa", exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
-    checkm_qa_bacteria: Path | None = typer.Option(None, "--checkm-qa-bacteria", exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
-    checkm_qa_archaea: Path | None = typer.Option(None, "--checkm-qa-archaea", exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
-    checkm_results: Path | None = typer.Option(None, "--checkm-results", exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
-    completeness_min: float = typer.Option(90.0, "--completeness-min"),
-    contamination_max: float = typer.Option(10.0, "--contamination-max"),
-    place_mode: str = typer.Option("copy", "--place-mode", help="copy|symlink|hardlink"),
-    checkm_bin: str = typer.Option("checkm", "--checkm-bin"),
+    p.add_argument("--checkm-qa", **_FILE_IN_OPT)
+    p.add_argument("--checkm-qa-bacteria", **_FILE_IN_OPT)
+    p.add_argument("--checkm-qa-archaea", **_FILE_IN_OPT)
+    p.add_argument("--checkm-results", **_FILE_IN_OPT)
+    p.add_argument("--completeness-min", type=float, default=90.0)
+    p.add_argument("--contamination-max", type=float, default=10.0)
+    p.add_argument("--place-mode", default="copy", help="copy|symlink|hardlink")
+    p.add_argument("--checkm-bin", default="checkm")
 
-    skip_barrnap: bool = typer.Option(False, "--skip-barrnap", help="Stop after QC."),
-    barrnap_bin: str = typer.Option("barrnap", "--barrnap-bin"),
-    barrnap_reject: float = typer.Option(0.8, "--barrnap-reject", min=0.0, max=1.0),
+    p.add_argument("--skip-barrnap", action="store_true", help="Stop after QC.")
+    p.add_argument("--barrnap-bin", default="barrnap")
+    p.add_argument("--barrnap-reject", type=_float_range(0.0, 1.0), default=0.8)
 
-    skip_rrna: bool = typer.Option(False, "--skip-rrna", help="Stop after Barrnap."),
-    vsearch_bin: str = typer.Option("vsearch", "--vsearch-bin"),
-    multi_cluster_id: float = typer.Option(0.90, "--multi-cluster-id", min=0.0, max=1.0),
-    final_cluster_id: float = typer.Option(1.0, "--final-cluster-id", min=0.0, max=1.0),
+    p.add_argument("--skip-rrna", action="store_true", help="Stop after Barrnap.")
+    p.add_argument("--vsearch-bin", default="vsearch")
+    p.add_argument("--multi-cluster-id", type=_float_range(0.0, 1.0), default=0.90)
+    p.add_argument("--final-cluster-id", type=_float_range(0.0, 1.0), default=1.0)
 
-    skip_align: bool = typer.Option(False, "--skip-align", help="Stop after rrna."),
-    cmalign_bin: str = typer.Option("cmalign", "--cmalign-bin"),
-    esl_reformat_bin: str = typer.Option("esl-reformat", "--esl-reformat-bin"),
-    ssu_models_dir: Path = typer.Option(..., "--ssu-models-dir", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    cmalign_mxsize_archaea: int = typer.Option(4096, "--cmalign-mxsize-archaea", min=1),
-    cmalign_mxsize_bacteria: int = typer.Option(8192, "--cmalign-mxsize-bacteria", min=1),
+    p.add_argument("--skip-align", action="store_true", help="Stop after rrna.")
+    p.add_argument("--cmalign-bin", default="cmalign")
+    p.add_argument("--esl-reformat-bin", default="esl-reformat")
+    p.add_argument("--ssu-models-dir", **_DIR_IN)
+    p.add_argument("--cmalign-mxsize-archaea", type=_int_range(1), default=4096)
+    p.add_argument("--cmalign-mxsize-bacteria", type=_int_range(1), default=8192)
 
-    skip_choose_best: bool = typer.Option(False, "--skip-choose-best", help="Stop after align."),
+    p.add_argument("--skip-choose-best", action="store_true", help="Stop after align.")
 
-    skip_raxml_check: bool = typer.Option(False, "--skip-raxml-check", help="Stop after choose-best."),
-    raxml_ng_bin: str = typer.Option("raxml-ng", "--raxml-ng-bin"),
+    p.add_argument("--skip-raxml-check", action="store_true", help="Stop after choose-best.")
+    p.add_argument("--raxml-ng-bin", default="raxml-ng")
 
-    skip_iqtree: bool = typer.Option(False, "--skip-iqtree", help="Stop after raxml-check."),
-    iqtree_bin: str = typer.Option("iqtree", "--iqtree-bin"),
-    iqtree_bootstrap: int = typer.Option(1000, "--iqtree-bootstrap", min=0),
-    iqtree_seed: int = typer.Option(12345, "--iqtree-seed"),
+    p.add_argument("--skip-iqtree", action="store_true", help="Stop after raxml-check.")
+    p.add_argument("--iqtree-bin", default="iqtree")
+    p.add_argument("--iqtree-bootstrap", type=_int_range(0), default=1000)
+    p.add_argument("--iqtree-seed", type=int, default=12345)
 
-    skip_raxml_evaluate: bool = typer.Option(False, "--skip-raxml-evaluate", help="Stop after IQ-TREE."),
+    p.add_argument("--skip-raxml-evaluate", action="store_true", help="Stop after IQ-TREE.")
 
-    skip_hmm_prep: bool = typer.Option(False, "--skip-hmm-prep", help="Stop after RAxML-evaluate."),
+    p.add_argument("--skip-hmm-prep", action="store_true", help="Stop after RAxML-evaluate.")
 
-    skip_hmm_build: bool = typer.Option(False, "--skip-hmm-build", help="Stop after HMM-prep."),
-    hmmbuild_bin: str = typer.Option("hmmbuild", "--hmmbuild-bin"),
+    p.add_argument("--skip-hmm-build", action="store_true", help="Stop after HMM-prep.")
+    p.add_argument("--hmmbuild-bin", default="hmmbuild")
 
-    skip_package_ref: bool = typer.Option(False, "--skip-package-ref", help="Stop after HMM-build."),
+    p.add_argument("--skip-package-ref", action="store_true", help="Stop after HMM-build.")
 
-    skip_ko_table: bool = typer.Option(False, "--skip-ko-table", help="Stop after package-ref."),
-    skip_ec_table: bool = typer.Option(False, "--skip-ec-table", help="Stop after KO table."),
+    p.add_argument("--skip-ko-table", action="store_true", help="Stop after package-ref.")
+    p.add_argument("--skip-ec-table", action="store_true", help="Stop after KO table.")
 
-    eggnog_existing_dir: Path | None = typer.Option(
-        None,
+    p.add_argument(
         "--eggnog-existing-dir",
-        exists=True,
-        file_okay=False,
-        dir_okay=True,
-        readable=True,
-        resolve_path=True,
+        **_DIR_IN_OPT,
         help="Directory containing existing eggNOG files named <genome_id>.emapper.annotations.",
-    ),
-    allow_missing_eggnog: bool = typer.Option(
-        False,
+    )
+    p.add_argument(
         "--allow-missing-eggnog",
+        action="store_true",
         help="Allow genomes without matching eggNOG annotations and write zero-filled trait rows.",
-    ),
+    )
+
+    p.add_argument("--force", action="store_true")
+
+
+def cmd_run(
+    *,
+    mags: Path,
+    out: Path,
+
+    rename_map: Path | None,
+    sequential_ids: bool,
+    out_prefix: str,
+    pad: int,
+
+    gtdb_classify: Path | None,
+    cpus: int,
 
-    force: bool = typer.Option(False, "--force"),
+    move_tax_split: bool,
+
+    skip_qc: bool,
+
+    checkm_qa: Path | None,
+    checkm_qa_bacteria: Path | None,
+    checkm_qa_archaea: Path | None,
+    checkm_results: Path | None,
+    completeness_min: float,
+    contamination_max: float,
+    place_mode: str,
+    checkm_bin: str,
+
+    skip_barrnap: bool,
+    barrnap_bin: str,
+    barrnap_reject: float,
+
+    skip_rrna: bool,
+    vsearch_bin: str,
+    multi_cluster_id: float,
+    final_cluster_id: float,
+
+    skip_align: bool,
+    cmalign_bin: str,
+    esl_reformat_bin: str,
+    ssu_models_dir: Path,
+    cmalign_mxsize_archaea: int,
+    cmalign_mxsize_bacteria: int,
+
+    skip_choose_best: bool,
+
+    skip_raxml_check: bool,
+    raxml_ng_bin: str,
+
+    skip_iqtree: bool,
+    iqtree_bin: str,
+    iqtree_bootstrap: int,
+    iqtree_seed: int,
+
+    skip_raxml_evaluate: bool,
+
+    skip_hmm_prep: bool,
+
+    skip_hmm_build: bool,
+    hmmbuild_bin: str,
+
+    skip_package_ref: bool,
+
+    skip_ko_table: bool,
+    skip_ec_table: bool,
+
+    eggnog_existing_dir: Path | None,
+    allow_missing_eggnog: bool,
+
+    force: bool,
 ) -> None:
     """
     Run MAGPIE workflow through marker-reference packaging, KO table creation, and EC table creation.
     """
+    # Decide once whether step announcements are emitted at all.
+    info = _LOGGER.info if _LOGGER.isEnabledFor(logging.INFO) else _log_noop
+
     _validate_checkm_reuse_args(
         checkm_qa=checkm_qa,
         checkm_qa_bacteria=checkm_qa_bacteria,
@@ -179,6 +293,28 @@ def cmd_run(
         checkm_results=checkm_results,
     )
 
+    # Import every step before step 1, so a missing dependency (e.g. Biopython for
+    # choose-best) stops the run up front rather than hours into it.
+    from .steps.validate import validate_step
+    from .steps.prep import prep_step
+    from .steps.gtdbtk import gtdbtk_step
+    from .steps.taxonomy import taxonomy_step
+    from .steps.qc import qc_step
+    from .steps.barrnap import barrnap_step
+    from .steps.rrna import rrna_step
+    from .steps.align import align_step
+    from .steps.choose_best import choose_best_step
+    from .steps.raxml_check import raxml_check_step
+    from .steps.iqtree import iqtree_step
+    from .steps.raxml_evaluate import raxml_evaluate_step
+    from .steps.hmm_prep import hmm_prep_step
+    from .steps.hmm_build import hmm_build_step
+    from .steps.package_ref import package_ref_step
+    from .steps.ko_table import ko_table_step
+    from .steps.ec_table import ec_table_step
+
+    # `out` is already resolved by the argument parser, so the step dirs below are
+    # plain joins and need no further resolve() downstream.
     validate_dir = out / "01_validate"
     prep_dir = out / "02_prep"
     gtdb_dir = out / "03_gtdbtk"
@@ -206,175 +342,172 @@ def cmd_run(
     )
     require_checkm = (not skip_qc) and (not reuse_provided)
 
-    _LOGGER.info("Step 1/17: validate -> %s", validate_dir)
-    validate_step(mags=mags, out=validate_dir, force=force, require_gtdbtk=require_gtdbtk, require_checkm=require_checkm)
-
-    _LOGGER.info("Step 2/17: prep -> %s", prep_dir)
-    prep_step(mags=mags, out=prep_dir, rename_map=rename_map, force=force, sequential_ids=sequential_ids, out_prefix=out_prefix, pad=pad)
-
-    _LOGGER.info("Step 3/17: gtdbtk -> %s", gtdb_dir)
-    classify_dir = gtdbtk_step(mags_dir=prep_dir / "mags", out=gtdb_dir, gtdb_classify=gtdb_classify, cpus=cpus, force=force)
-
-    _LOGGER.info("Step 4/17: taxonomy -> %s", tax_dir)
-    taxonomy_step(prep_dir=prep_dir, classify_dir=classify_dir, out=tax_dir, force=force, move_files=move_tax_split)
-
-    if skip_qc:
-        _LOGGER.warning("Skipping QC (--skip-qc).")
-        return
-
-    _LOGGER.info("Step 5/17: qc -> %s", qc_dir)
-    qc_step(
-        tax_dir=tax_dir,
-        out=qc_dir,
-        cpus=cpus,
+    # validate is the pre-flight check (input FASTAs, required tools): it must pass
+    # before prep writes anything.
+    info("Step 1/17: validate -> %s", validate_dir)
+    validate_step(
+        mags=mags,
+        out=validate_dir,
         force=force,
-        checkm_qa=checkm_qa,
-        checkm_qa_bacteria=checkm_qa_bacteria,
-        checkm_qa_archaea=checkm_qa_archaea,
-        checkm_results=checkm_results,
-        completeness_min=completeness_min,
-        contamination_max=contamination_max,
-        place_mode=place_mode,
-        checkm_bin=checkm_bin,
+        require_gtdbtk=require_gtdbtk,
+        require_checkm=require_checkm,
     )
 
-    if skip_barrnap:
-        _LOGGER.warning("Skipping Barrnap (--skip-barrnap).")
-        return
-
-    _LOGGER.info("Step 6/17: barrnap -> %s", barrnap_dir)
-    barrnap_step(qc_dir=qc_dir, out=barrnap_dir, cpus=cpus, force=force, barrnap_bin=barrnap_bin, reject=barrnap_reject)
-
-    if skip_rrna:
-        _LOGGER.warning("Skipping rrna (--skip-rrna).")
-        return
-
-    _LOGGER.info("Step 7/17: rrna -> %s", rrna_dir)
-    rrna_step(
-        barrnap_dir=barrnap_dir,
-        out=rrna_dir,
-        cpus=cpus,
+    info("Step 2/17: prep -> %s", prep_dir)
+    prep_step(
+        mags=mags,
+        out=prep_dir,
+        rename_map=rename_map,
         force=force,
-        vsearch_bin=vsearch_bin,
-        multi_cluster_id=multi_cluster_id,
-        final_cluster_id=final_cluster_id,
-    )
-
-    if skip_align:
-        _LOGGER.warning("Skipping align (--skip-align).")
-        return
-
-    _LOGGER.info("Step 8/17: align -> %s", align_dir)
-    align_step(
-        rrna_dir=rrna_dir,
-        out=align_dir,
+        sequential_ids=sequential_ids,
+        out_prefix=out_prefix,
+        pad=pad,
         cpus=cpus,
-        force=force,
-        cmalign_bin=cmalign_bin,
-        esl_reformat_bin=esl_reformat_bin,
-        ssu_models_dir=ssu_models_dir,
-        mxsize_archaea=cmalign_mxsize_archaea,
-        mxsize_bacteria=cmalign_mxsize_bacteria,
     )
 
-    if skip_choose_best:
-        _LOGGER.warning("Skipping choose-best (--skip-choose-best).")
-        return
-
-    _LOGGER.info("Step 9/17: choose-best -> %s", choose_best_dir)
-    choose_best_step(prep_dir=prep_dir, qc_dir=qc_dir, rrna_dir=rrna_dir, align_dir=align_dir, out=choose_best_dir, force=force)
-
-    if skip_raxml_check:
-        _LOGGER.warning("Skipping raxml-check (--skip-raxml-check).")
-        return
-
-    _LOGGER.info("Step 10/17: raxml-check -> %s", raxml_dir)
-    raxml_check_step(choose_best_dir=choose_best_dir, out=raxml_dir, raxml_ng_bin=raxml_ng_bin, threads=cpus, force=force)
-
-    if skip_iqtree:
-        _LOGGER.warning("Skipping iqtree (--skip-iqtree).")
-        return
-
-    _LOGGER.info("Step 11/17: iqtree -> %s", iqtree_dir)
-    iqtree_step(raxml_check_dir=raxml_dir, out=iqtree_dir, iqtree_bin=iqtree_bin, threads=cpus, bootstrap=iqtree_bootstrap, seed=iqtree_seed, force=force)
-
-    if skip_raxml_evaluate:
-        _LOGGER.warning("Skipping raxml-evaluate (--skip-raxml-evaluate).")
-        return
-
-    _LOGGER.info("Step 12/17: raxml-evaluate -> %s", raxml_eval_dir)
-    raxml_evaluate_step(raxml_check_dir=raxml_dir, iqtree_dir=iqtree_dir, out=raxml_eval_dir, raxml_ng_bin=raxml_ng_bin, threads=cpus, force=force)
-
-    if skip_hmm_prep:
-        _LOGGER.warning("Skipping hmm-prep (--skip-hmm-prep).")
-        return
-
-    _LOGGER.info("Step 13/17: hmm-prep -> %s", hmm_prep_dir)
-    hmm_prep_step(raxml_check_dir=raxml_dir, out=hmm_prep_dir, esl_reformat_bin=esl_reformat_bin, force=force)
-
-    if skip_hmm_build:
-        _LOGGER.warning("Skipping hmm-build (--skip-hmm-build).")
-        return
-
-    _LOGGER.info("Step 14/17: hmm-build -> %s", hmm_build_dir)
-    hmm_build_step(hmm_prep_dir=hmm_prep_dir, out=hmm_build_dir, hmmbuild_bin=hmmbuild_bin, cpus=cpus, force=force)
-
-    if skip_package_ref:
-        _LOGGER.warning("Skipping package-ref (--skip-package-ref).")
-        return
-
-    _LOGGER.info("Step 15/17: package-ref -> %s", package_ref_dir)
-    package_ref_step(
-        rrna_dir=rrna_dir,
-        iqtree_dir=iqtree_dir,
-        raxml_evaluate_dir=raxml_eval_dir,
-        hmm_prep_dir=hmm_prep_dir,
-        hmm_build_dir=hmm_build_dir,
-        out=package_ref_dir,
+    info("Step 3/17: gtdbtk -> %s", gtdb_dir)
+    classify_dir = gtdbtk_step(
+        mags_dir=prep_dir / "mags",
+        out=gtdb_dir,
+        gtdb_classify=gtdb_classify,
+        cpus=cpus,
         force=force,
+        pre_resolved=True,
     )
 
-    if skip_ko_table:
-        _LOGGER.warning("Skipping ko-table (--skip-ko-table).")
-        return
-
-    if eggnog_existing_dir is None:
-        raise typer.BadParameter("To build KO/EC tables, provide --eggnog-existing-dir or use --skip-ko-table.")
-
-    _LOGGER.info("Step 16/17: ko-table -> %s", ko_table_dir)
-    ko_table_step(
-        package_ref_dir=package_ref_dir,
-        eggnog_existing_dir=eggnog_existing_dir,
-        out=ko_table_dir,
+    info("Step 4/17: taxonomy -> %s", tax_dir)
+    taxonomy_step(
+        prep_dir=prep_dir,
+        classify_dir=classify_dir,
+        out=tax_dir,
         force=force,
-        allow_missing_eggnog=allow_missing_eggnog,
+        move_files=move_tax_split,
+        cpus=cpus,
     )
 
-    if skip_ec_table:
-        _LOGGER.warning("Skipping ec-table (--skip-ec-table).")
-        return
-
-    _LOGGER.info("Step 17/17: ec-table -> %s", ec_table_dir)
-    ec_table_step(
-        package_ref_dir=package_ref_dir,
-        eggnog_existing_dir=eggnog_existing_dir,
-        out=ec_table_dir,
-        force=force,
-        allow_missing_eggnog=allow_missing_eggnog,
+    # Steps 5-17 run strictly in order, each after its --skip-<name> flag is checked.
+    # (title, step dir, skip flag, step function, step kwargs, precondition error or None);
+    # the step/flag name is the lower-cased title.
+    eggnog_error = (
+        None
+        if eggnog_existing_dir is not None
+        else "To build KO/EC tables, provide --eggnog-existing-dir or use --skip-ko-table."
     )
-
-    _LOGGER.info("MAGPIE run complete.")
+    stages: list[tuple[str, Path, bool, Callable[..., Any], dict[str, Any], str | None]] = [
+        ("QC", qc_dir, skip_qc, qc_step, dict(
+            tax_dir=tax_dir,
+            out=qc_dir,
+            cpus=cpus,
+            force=force,
+            checkm_qa=checkm_qa,
+            checkm_qa_bacteria=checkm_qa_bacteria,
+            checkm_qa_archaea=checkm_qa_archaea,
+            checkm_results=checkm_results,
+            completeness_min=completeness_min,
+            contamination_max=contamination_max,
+            place_mode=place_mode,
+            checkm_bin=checkm_bin,
+        ), None),
+        ("Barrnap", barrnap_dir, skip_barrnap, barrnap_step, dict(
+            qc_dir=qc_dir, out=barrnap_dir, cpus=cpus, force=force, barrnap_bin=barrnap_bin, reject=barrnap_reject,
+        ), None),
+        ("rrna", rrna_dir, skip_rrna, rrna_step, dict(
+            barrnap_dir=barrnap_dir,
+            out=rrna_dir,
+            cpus=cpus,
+            force=force,
+            vsearch_bin=vsearch_bin,
+            multi_cluster_id=multi_cluster_id,
+            final_cluster_id=final_cluster_id,
+        ), None),
+        ("align", align_dir, skip_align, align_step, dict(
+            rrna_dir=rrna_dir,
+            out=align_dir,
+            cpus=cpus,
+            force=force,
+            cmalign_bin=cmalign_bin,
+            esl_reformat_bin=esl_reformat_bin,
+            ssu_models_dir=ssu_models_dir,
+            mxsize_archaea=cmalign_mxsize_archaea,
+            mxsize_bacteria=cmalign_mxsize_bacteria,
+        ), None),
+        ("choose-best", choose_best_dir, skip_choose_best, choose_best_step, dict(
+            prep_dir=prep_dir, qc_dir=qc_dir, rrna_dir=rrna_dir, align_dir=align_dir, out=choose_best_dir, force=force,
+        ), None),
+        ("raxml-check", raxml_dir, skip_raxml_check, raxml_check_step, dict(
+            choose_best_dir=choose_best_dir, out=raxml_dir, raxml_ng_bin=raxml_ng_bin, threads=cpus, force=force,
+        ), None),
+        ("iqtree", iqtree_dir, skip_iqtree, iqtree_step, dict(
+            raxml_check_dir=raxml_dir, out=iqtree_dir, iqtree_bin=iqtree_bin, threads=cpus, bootstrap=iqtree_bootstrap, seed=iqtree_seed, force=force,
+        ), None),
+        ("raxml-evaluate", raxml_eval_dir, skip_raxml_evaluate, raxml_evaluate_step, dict(
+            raxml_check_dir=raxml_dir, iqtree_dir=iqtree_dir, out=raxml_eval_dir, raxml_ng_bin=raxml_ng_bin, threads=cpus, force=force,
+        ), None),
+        ("hmm-prep", hmm_prep_dir, skip_hmm_prep, hmm_prep_step, dict(
+            raxml_check_dir=raxml_dir, out=hmm_prep_dir, esl_reformat_bin=esl_reformat_bin, force=force,
+        ), None),
+        ("hmm-build", hmm_build_dir, skip_hmm_build, hmm_build_step, dict(
+            hmm_prep_dir=hmm_prep_dir, out=hmm_build_dir, hmmbuild_bin=hmmbuild_bin, cpus=cpus, force=force,
+        ), None),
+        ("package-ref", package_ref_dir, skip_package_ref, package_ref_step, dict(
+            rrna_dir=rrna_dir,
+            iqtree_dir=iqtree_dir,
+            raxml_evaluate_dir=raxml_eval_dir,
+            hmm_prep_dir=hmm_prep_dir,
+            hmm_build_dir=hmm_build_dir,
+            out=package_ref_dir,
+            force=force,
+        ), None),
+        ("ko-table", ko_table_dir, skip_ko_table, ko_table_step, dict(
+            package_ref_dir=package_ref_dir,
+            eggnog_existing_dir=eggnog_existing_dir,
+            out=ko_table_dir,
+            force=force,
+            allow_missing_eggnog=allow_missing_eggnog,
+        ), eggnog_error),
+        ("ec-table", ec_table_dir, skip_ec_table, ec_table_step, dict(
+            package_ref_dir=package_ref_dir,
+            eggnog_existing_dir=eggnog_existing_dir,
+            out=ec_table_dir,
+            force=force,
+            allow_missing_eggnog=allow_missing_eggnog,
+        ), None),
+    ]
+
+    for n, (title, step_dir, skip, step_fn, kwargs, error) in enumerate(stages, start=5):
+        name = title.lower()
+        if skip:
+            _LOGGER.warning("Skipping %s (--skip-%s).", title, name)
+            return
+
+        if error is not None:
+            raise BadParameter(error)
+
+        info("Step %d/17: %s -> %s", n, name, step_dir)
+        step_fn(**kwargs)
+
+    info("MAGPIE run complete.")
+
+
+def _add_table_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--package-ref-dir", **_DIR_IN)
+    p.add_argument("--eggnog-existing-dir", **_DIR_IN)
+    p.add_argument("--out", **_DIR_OUT)
+    p.add_argument("--allow-missing-eggnog", action="store_true")
+    p.add_argument("--force", action="store_true")
 
 
-@app.command("ko-table")
 def cmd_ko_table(
-    package_ref_dir: Path = typer.Option(..., "--package-ref-dir", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    eggnog_existing_dir: Path = typer.Option(..., "--eggnog-existing-dir", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    out: Path = typer.Option(..., "--out", file_okay=False, dir_okay=True, resolve_path=True),
-    allow_missing_eggnog: bool = typer.Option(False, "--allow-missing-eggnog"),
-    force: bool = typer.Option(False, "--force"),
+    *,
+    package_ref_dir: Path,
+    eggnog_existing_dir: Path,
+    out: Path,
+    allow_missing_eggnog: bool,
+    force: bool,
 ) -> None:
     """Build PICRUSt2-style ko.txt.gz tables from existing eggNOG annotations."""
+    from .steps.ko_table import ko_table_step
+
     ko_table_step(
         package_ref_dir=package_ref_dir,
         eggnog_existing_dir=eggnog_existing_dir,
@@ -384,15 +517,17 @@ def cmd_ko_table(
     )
 
 
-@app.command("ec-table")
 def cmd_ec_table(
-    package_ref_dir: Path = typer.Option(..., "--package-ref-dir", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    eggnog_existing_dir: Path = typer.Option(..., "--eggnog-existing-dir", exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    out: Path = typer.Option(..., "--out", file_okay=False, dir_okay=True, resolve_path=True),
-    allow_missing_eggnog: bool = typer.Option(False, "--allow-missing-eggnog"),
-    force: bool = typer.Option(False, "--force"),
+    *,
+    package_ref_dir: Path,
+    eggnog_existing_dir: Path,
+    out: Path,
+    allow_missing_eggnog: bool,
+    force: bool,
 ) -> None:
     """Build PICRUSt2-style ec.txt.gz tables from existing eggNOG annotations."""
+    from .steps.ec_table import ec_table_step
+
     ec_table_step(
         package_ref_dir=package_ref_dir,
         eggnog_existing_dir=eggnog_existing_dir,
@@ -401,50 +536,49 @@ def cmd_ec_table(
         allow_missing_eggnog=allow_missing_eggnog,
     )
 
-@app.command("install-picrust2-ref")
-def cmd_install_picrust2_ref(
-    package_ref_dir: Path = typer.Option(
-        ...,
+
+def _add_install_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
         "--package-ref-dir",
-        exists=True,
-        file_okay=False,
-        dir_okay=True,
-        readable=True,
-        resolve_path=True,
+        **_DIR_IN,
         help="MAGPIE package-ref output directory, e.g. out/15_package_ref.",
-    ),
-    picrust2_env: Path = typer.Option(
-        ...,
+    )
+    p.add_argument(
         "--picrust2-env",
-        exists=True,
-        file_okay=False,
-        dir_okay=True,
-        readable=True,
-        resolve_path=True,
+        **_DIR_IN,
         help="Path to the PICRUSt2 conda environment whose default files should be replaced.",
-    ),
-    out: Path = typer.Option(
-        ...,
+    )
+    p.add_argument(
         "--out",
-        file_okay=False,
-        dir_okay=True,
-        resolve_path=True,
+        **_DIR_OUT,
         help="Output directory for install manifest and optional backups.",
-    ),
-    backup: bool = typer.Option(
-        True,
-        "--backup/--no-backup",
+    )
+    p.add_argument(
+        "--backup",
+        action=argparse.BooleanOptionalAction,
+        default=True,
         help="Back up existing PICRUSt2 default files before replacing them.",
-    ),
-    force: bool = typer.Option(
-        False,
+    )
+    p.add_argument(
         "--force",
+        action="store_true",
         help="Overwrite existing PICRUSt2 default files.",
-    ),
+    )
+
+
+def cmd_install_picrust2_ref(
+    *,
+    package_ref_dir: Path,
+    picrust2_env: Path,
+    out: Path,
+    backup: bool,
+    force: bool,
 ) -> None:
     """
     Install MAGPIE-produced PICRUSt2 reference files into a selected PICRUSt2 conda environment.
     """
+    from .steps.install_picrust2_ref import install_picrust2_ref_step
+
     install_picrust2_ref_step(
         package_ref_dir=package_ref_dir,
         picrust2_env=picrust2_env,
@@ -453,5 +587,80 @@ def cmd_install_picrust2_ref(
         backup=backup,
     )
 
+
+# name -> (help, argument builder, command)
+_COMMANDS: dict[str, tuple[str, Callable[[argparse.ArgumentParser], None], Callable[..., None]]] = {
+    "run": (
+        "Run MAGPIE workflow through marker-reference packaging, KO table creation, and EC table creation.",
+        _add_run_args,
+        cmd_run,
+    ),
+    "ko-table": (
+        "Build PICRUSt2-style ko.txt.gz tables from existing eggNOG annotations.",
+        _add_table_args,
+        cmd_ko_table,
+    ),
+    "ec-table": (
+        "Build PICRUSt2-style ec.txt.gz tables from existing eggNOG annotations.",
+        _add_table_args,
+        cmd_ec_table,
+    ),
+    "install-picrust2-ref": (
+        "Install MAGPIE-produced PICRUSt2 reference files into a selected PICRUSt2 conda environment.",
+        _add_install_args,
+        cmd_install_picrust2_ref,
+    ),
+}
+
+
+def _build_parser(argv: Sequence[str]) -> tuple[argparse.ArgumentParser, dict[str, argparse.ArgumentParser]]:
+    """
+    Build the CLI parser and its subcommand parsers (by name). Only the subcommand
+    named in argv gets its options populated; the others are registered with their
+    help text alone so the top-level --help still lists them.
+    """
+    # allow_abbrev=False everywhere: Typer never accepted option prefixes like --allow.
+    parser = argparse.ArgumentParser(prog="magpie", description=_DESCRIPTION, allow_abbrev=False)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable INFO-level logging.")
+    parser.add_argument("--debug", action="store_true", help="Enable DEBUG-level logging (very noisy).")
+    sub = parser.add_subparsers(dest="cmd", metavar="COMMAND")
+
+    # Global options are flags only, so the first positional token is the subcommand.
+    selected = next((a for a in argv if not a.startswith("-")), None)
+    subparsers: dict[str, argparse.ArgumentParser] = {}
+    for name, (help_text, add_args, _) in _COMMANDS.items():
+        sp = sub.add_parser(name, help=help_text, description=help_text, allow_abbrev=False)
+        if name == selected:
+            add_args(sp)
+        subparsers[name] = sp
+    return parser, subparsers
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser, subparsers = _build_parser(argv)
+    args = parser.parse_args(argv)
+    if args.cmd is None:
+        parser.print_help()
+        return 0
+
+    _configure_logging(verbose=args.verbose, debug=args.debug)
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("Logging configured (verbose=%s, debug=%s).", args.verbose, args.debug)
+
+    kwargs = vars(args)
+    cmd = kwargs.pop("cmd")
+    kwargs.pop("verbose")
+    kwargs.pop("debug")
+    try:
+        _COMMANDS[cmd][2](**kwargs)
+    except BadParameter as e:
+        # Report against the subcommand, so the usage line shows its own options.
+        subparsers[cmd].error(str(e))
+    return 0
+
+
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -8,7 +8,7 @@ import shutil
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, TextIO, Tuple
 
 _LOGGER = logging.getLogger("magpie.barrnap")
 
@@ -52,33 +52,34 @@ def _iter_genome_files(dir_: Path) -> Iterable[Path]:
             yield p
 
 
-def _read_text_fasta(path: Path) -> str:
+def _open_text_fasta(path: Path) -> TextIO:
     if path.name.lower().endswith(GZ_EXT):
-        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as fh:
-            return fh.read()
-    return path.read_text(encoding="utf-8", errors="replace")
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return path.open("r", encoding="utf-8", errors="replace")
 
 
 def _read_fasta_dict(path: Path) -> Dict[str, str]:
     """
     Read FASTA into dict keyed by first token of header.
+    Lines are streamed, so the whole file is never held as one string.
     """
-    text = _read_text_fasta(path)
     seqs: Dict[str, List[str]] = {}
     current = None
 
-    for line in text.splitlines():
-        if not line:
-            continue
-        if line.startswith(">"):
-            current = line[1:].strip().split()[0]
-            if current in seqs:
-                raise ValueError(f"Duplicate FASTA header '{current}' in {path}")
-            seqs[current] = []
-        else:
-            if current is None:
-                raise ValueError(f"Malformed FASTA without header in {path}")
-            seqs[current].append(line.strip())
+    with _open_text_fasta(path) as fh:
+        for raw in fh:
+            line = raw.rstrip("\n")
+            if not line:
+                continue
+            if line.startswith(">"):
+                current = line[1:].strip().split()[0]
+                if current in seqs:
+                    raise ValueError(f"Duplicate FASTA header '{current}' in {path}")
+                seqs[current] = []
+            else:
+                if current is None:
+                    raise ValueError(f"Malformed FASTA without header in {path}")
+                seqs[current].append(line.strip())
 
     return {k: "".join(v).upper() for k, v in seqs.items()}
 
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
 import csv
-import gzip
 import logging
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
 from ..util.shell import run_cmd as shell_run
 from ..util.deps import check_checkm
+from ..util.io import COPY_BUFSIZE, link_or_copy, open_gz_read
 
 _LOGGER = logging.getLogger("magpie.checkm")
 
 FASTA_SUFFIXES = (".fa", ".fna", ".fasta")
+_ALL_FASTA_SUFFIXES = FASTA_SUFFIXES + tuple(sfx + ".gz" for sfx in FASTA_SUFFIXES)
 
 
 def _ensure_dir(p: Path) -> None:
@@ -20,77 +24,97 @@ def _ensure_dir(p: Path) -> None:
 
 def _iter_fasta_files(d: Path) -> list[Path]:
     files: list[Path] = []
-    for p in d.iterdir():
-        if not p.is_file():
-            continue
-        name = p.name.lower()
-        if any(name.endswith(sfx) for sfx in FASTA_SUFFIXES) or any(name.endswith(sfx + ".gz") for sfx in FASTA_SUFFIXES):
-            files.append(p)
+    with os.scandir(d) as it:
+        for e in it:
+            if e.name.lower().endswith(_ALL_FASTA_SUFFIXES) and e.is_file():
+                files.append(Path(e.path))
     return sorted(files)
 
 
-def _gunzip_to(src_gz: Path, dst: Path) -> None:
-    with gzip.open(src_gz, "rb") as fin, open(dst, "wb") as fout:
-        shutil.copyfileobj(fin, fout)
+def _gunzip_to(src_gz: Path, dst: Path, threads: int = 1) -> None:
+    dst.unlink(missing_ok=True)  # may be a hardlink staged by an earlier run
+    with open_gz_read(src_gz, threads) as fin, open(dst, "wb") as fout:
+        shutil.copyfileobj(fin, fout, length=COPY_BUFSIZE)
 
 
-def _stage_fastas(src_dir: Path, dst_dir: Path) -> str:
+def _staged_fp(src: Path, dst_dir: Path) -> Path:
+    name = src.name
+    if name.lower().endswith(".gz"):
+        name = name[:-3]
+
+    stem = name
+    for sfx in FASTA_SUFFIXES:
+        if stem.lower().endswith(sfx):
+            stem = stem[: -len(sfx)]
+            break
+
+    return dst_dir / f"{stem}.fna"
+
+
+def _stage_one(src: Path, out_fp: Path, threads: int = 1) -> None:
+    if src.name.lower().endswith(".gz"):
+        _gunzip_to(src, out_fp, threads)
+    else:
+        # CheckM only reads staged inputs, so a hardlink is as good as a copy.
+        link_or_copy(src, out_fp)
+
+
+def _stage_fastas(src_dir: Path, dst_dir: Path, cpus: int = 1) -> str:
     """
     Stage FASTAs into dst_dir, normalising to .fna.
     The output file stem is preserved (including dots), which is crucial for ID matching.
+    Files are staged in parallel on up to `cpus` threads; when there are fewer
+    files than cpus, the spare threads go to decompressing each file.
     """
     _ensure_dir(dst_dir)
     files = _iter_fasta_files(src_dir)
     if not files:
         raise FileNotFoundError(f"No FASTA(.gz) files found in: {src_dir}")
 
-    for p in files:
-        name = p.name
-        if name.lower().endswith(".gz"):
-            name = name[:-3]
-
-        stem = name
-        for sfx in FASTA_SUFFIXES:
-            if stem.lower().endswith(sfx):
-                stem = stem[: -len(sfx)]
-                break
-
-        out_fp = dst_dir / f"{stem}.fna"
-        if p.name.lower().endswith(".gz"):
-            _gunzip_to(p, out_fp)
-        else:
-            shutil.copy2(p, out_fp)
+    # Inputs sharing a stem (A.fa, A.fna.gz) stage to the same file: keep only the last
+    # one in sorted order, as sequential staging did, so no file is written concurrently.
+    jobs = {_staged_fp(p, dst_dir): p for p in files}
+    threads = max(1, cpus // len(jobs))
+    with ThreadPoolExecutor(max_workers=cpus) as ex:
+        list(ex.map(lambda job: _stage_one(job[1], job[0], threads), jobs.items()))
 
     return "fna"
 
 
-def _write_min_tsv(checkm_qa_tsv: Path, out_min_tsv: Path) -> None:
+def _write_min_tsv(checkm_qa_tsv: Path, out_min_tsv: Path, extra_writer: Any | None = None) -> None:
+    """
+    Write the minimal (genome_id, completeness, contamination) TSV for one QA table.
+    If extra_writer (a csv writer already past its header) is given, every row is
+    also written to it, so a merged table can be built in the same pass.
+    """
     with open(checkm_qa_tsv, "r", encoding="utf-8", errors="replace", newline="") as fh:
         reader = csv.reader(fh, delimiter="\t")
-        rows = list(reader)
-
-    if not rows:
-        raise ValueError(f"Empty CheckM QA file: {checkm_qa_tsv}")
-
-    header = rows[0]
-    idx = {h: i for i, h in enumerate(header)}
-    needed = ["Bin Id", "Completeness", "Contamination"]
-    missing = [c for c in needed if c not in idx]
-    if missing:
-        raise ValueError(f"CheckM QA TSV missing columns {missing}. Seen: {header}")
-
-    _ensure_dir(out_min_tsv.parent)
-    with open(out_min_tsv, "w", encoding="utf-8", newline="") as out:
-        w = csv.writer(out, delimiter="\t")
-        w.writerow(["genome_id", "checkm_completeness", "checkm_contamination"])
-        for r in rows[1:]:
-            if not r or len(r) <= max(idx.values()):
-                continue
-            gid = r[idx["Bin Id"]].strip()
-            cpl = r[idx["Completeness"]].strip()
-            cnt = r[idx["Contamination"]].strip()
-            if gid:
-                w.writerow([gid, cpl, cnt])
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"Empty CheckM QA file: {checkm_qa_tsv}")
+
+        idx = {h: i for i, h in enumerate(header)}
+        needed = ["Bin Id", "Completeness", "Contamination"]
+        missing = [c for c in needed if c not in idx]
+        if missing:
+            raise ValueError(f"CheckM QA TSV missing columns {missing}. Seen: {header}")
+        gid_i, cpl_i, cnt_i = (idx[c] for c in needed)
+        max_i = max(idx.values())
+
+        # Single pass: rows are written as they are read.
+        _ensure_dir(out_min_tsv.parent)
+        with open(out_min_tsv, "w", encoding="utf-8", newline="") as out:
+            w = csv.writer(out, delimiter="\t")
+            w.writerow(["genome_id", "checkm_completeness", "checkm_contamination"])
+            for r in reader:
+                if not r or len(r) <= max_i:
+                    continue
+                gid = r[gid_i].strip()
+                if gid:
+                    row = [gid, r[cpl_i].strip(), r[cnt_i].strip()]
+                    w.writerow(row)
+                    if extra_writer is not None:
+                        extra_writer.writerow(row)
 
 
 def checkm_step(
@@ -108,7 +132,7 @@ def checkm_step(
         _LOGGER.info("Reusing existing merged CheckM TSV: %s", merged_min)
         return merged_min
 
-    dep = check_checkm()
+    dep = check_checkm(detect_version=False)
     if not dep.found:
         raise RuntimeError(
             "CheckM (checkm) not found on PATH. "
@@ -122,11 +146,18 @@ def checkm_step(
     _ensure_dir(out / "staged" / "bacteria")
     _ensure_dir(out / "staged" / "archaea")
 
-    ext = _stage_fastas(bacteria_dir, out / "staged" / "bacteria")
-    _stage_fastas(archaea_dir, out / "staged" / "archaea")
+    ext = _stage_fastas(bacteria_dir, out / "staged" / "bacteria", cpus=cpus)
+    _stage_fastas(archaea_dir, out / "staged" / "archaea", cpus=cpus)
 
-    shell_run([checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(out / "staged" / "bacteria"), str(out / "bacteria")])
-    shell_run([checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(out / "staged" / "archaea"), str(out / "archaea")])
+    # lineage_wf is long-running and chatty: send its output to a log file rather than memory.
+    shell_run(
+        [checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(out / "staged" / "bacteria"), str(out / "bacteria")],
+        log_fp=out / "lineage_wf.bacteria.log",
+    )
+    shell_run(
+        [checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(out / "staged" / "archaea"), str(out / "archaea")],
+        log_fp=out / "lineage_wf.archaea.log",
+    )
 
     bac_qa = out / "bacteria" / "checkm_qa.tsv"
     arc_qa = out / "archaea" / "checkm_qa.tsv"
@@ -135,18 +166,18 @@ def checkm_step(
 
     bac_min = out / "bacteria" / "checkm_results.min.tsv"
     arc_min = out / "archaea" / "checkm_results.min.tsv"
-    _write_min_tsv(bac_qa, bac_min)
-    _write_min_tsv(arc_qa, arc_min)
-
-    with open(merged_min, "w", encoding="utf-8", newline="") as out_fh:
-        w = csv.writer(out_fh, delimiter="\t")
-        w.writerow(["genome_id", "checkm_completeness", "checkm_contamination"])
-        for fp in (bac_min, arc_min):
-            with open(fp, "r", encoding="utf-8", newline="") as fh:
-                r = csv.reader(fh, delimiter="\t")
-                next(r, None)  # skip header
-                for row in r:
-                    if row:
-                        w.writerow(row)
+    # Build the merged table under a temporary name and only move it into place once both
+    # domains succeeded: a partial merged_min would be reused by the next non --force run.
+    merged_tmp = merged_min.with_name(merged_min.name + ".tmp")
+    try:
+        with open(merged_tmp, "w", encoding="utf-8", newline="") as out_fh:
+            w = csv.writer(out_fh, delimiter="\t")
+            w.writerow(["genome_id", "checkm_completeness", "checkm_contamination"])
+            _write_min_tsv(bac_qa, bac_min, extra_writer=w)
+            _write_min_tsv(arc_qa, arc_min, extra_writer=w)
+    except BaseException:
+        merged_tmp.unlink(missing_ok=True)
+        raise
+    os.replace(merged_tmp, merged_min)
 
     return merged_min
\ No newline at end of file
@@ -12,6 +12,8 @@ SUMMARY_FILES: Final[tuple[str, str]] = (
     "gtdbtk.ar53.summary.tsv",
 )
 
+FASTA_SUFFIXES: Final[tuple[str, ...]] = (".fa", ".fna", ".fasta", ".fa.gz", ".fna.gz", ".fasta.gz")
+
 
 def _find_classify_dir(out_dir: Path) -> Path:
     """
@@ -46,12 +48,16 @@ def gtdbtk_step(
     gtdb_classify: Path | None,
     force: bool,
     cpus: int = 8,
+    pre_resolved: bool = False,
 ) -> Path:
     """
     Either:
       - reuse an existing GTDB-Tk classify dir (gtdb_classify), OR
       - run gtdbtk classify_wf into `out`
 
+    pre_resolved: set when the caller already passes absolute, resolved paths
+    (as the CLI does), so the step skips its own Path.resolve() calls.
+
     Returns:
       Path to the classify directory containing summary files.
     """
@@ -62,7 +68,7 @@ def gtdbtk_step(
 
     # Reuse mode: user points directly at the classify folder
     if gtdb_classify is not None:
-        classify_dir = gtdb_classify.resolve()
+        classify_dir = gtdb_classify if pre_resolved else gtdb_classify.resolve()
         _assert_classify_dir_has_summaries(classify_dir)
         report = {
             "mode": "reuse",
@@ -75,11 +81,12 @@ def gtdbtk_step(
         return classify_dir
 
     # Run mode
-    mags_dir = mags_dir.resolve()
-    out = out.resolve()
+    if not pre_resolved:
+        mags_dir = mags_dir.resolve()
+        out = out.resolve()
 
     # Basic input presence check
-    fastas = [p for p in mags_dir.iterdir() if p.is_file() and p.name.lower().endswith((".fa", ".fna", ".fasta", ".fa.gz", ".fna.gz", ".fasta.gz"))]
+    fastas = [p for p in mags_dir.iterdir() if p.is_file() and p.name.lower().endswith(FASTA_SUFFIXES)]
     if not fastas:
         raise ValueError(f"No MAG FASTA files found in: {mags_dir}")
 
@@ -1,50 +1,55 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import gzip
-import json
+import logging
+import os
 import shutil
-from typing import Iterable
+from typing import BinaryIO, Iterable
+
+from ..util.io import COPY_BUFSIZE, fastcopy, open_gz_read
+from ..util.json_fast import dumps as dumps_json
+
+_LOGGER = logging.getLogger("magpie.prep")
 
 FASTA_SUFFIXES = (".fa", ".fna", ".fasta")
 FASTA_GZ_SUFFIXES = (".fa.gz", ".fna.gz", ".fasta.gz")
+_ALL_FASTA_SUFFIXES = FASTA_SUFFIXES + FASTA_GZ_SUFFIXES
 
 
-def _is_fasta(p: Path) -> bool:
-    s = p.name.lower()
-    return s.endswith(FASTA_SUFFIXES) or s.endswith(FASTA_GZ_SUFFIXES)
+def _is_fasta_name(name: str) -> bool:
+    return name.lower().endswith(_ALL_FASTA_SUFFIXES)
 
 
 def _iter_mag_fastas(mags_dir: Path) -> list[Path]:
-    files = [p for p in mags_dir.iterdir() if p.is_file() and _is_fasta(p)]
+    # os.scandir exposes the file type from the directory listing, avoiding a stat() per entry.
+    with os.scandir(mags_dir) as it:
+        files = [Path(e.path) for e in it if _is_fasta_name(e.name) and e.is_file()]
     return sorted(files, key=lambda x: x.name.lower())
 
 
-def _decompress_gz_to_bytes(src_gz: Path) -> bytes:
-    with gzip.open(src_gz, "rb") as f:
-        return f.read()
-
-
-def _read_bytes_from_plain(src: Path) -> bytes:
-    return src.read_bytes()
+def _open_fna_read(src: Path, threads: int = 1) -> BinaryIO:
+    """
+    Open a FASTA file (.fa/.fna/.fasta or gzipped) for binary reading.
 
+    v0.1: no header rewriting; just bytes-in/bytes-out.
+    """
+    if src.name.lower().endswith(".gz"):
+        return open_gz_read(src, threads)
+    return src.open("rb")
 
-def _write_gz_bytes(dst_gz: Path, data: bytes) -> None:
-    dst_gz.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(dst_gz, "wb") as f:
-        f.write(data)
 
+def _decompress_to(src_gz: Path, dst: Path, threads: int = 1) -> None:
+    # Stream through a fixed buffer so peak memory does not scale with genome size.
+    with open_gz_read(src_gz, threads) as fin, dst.open("wb") as fout:
+        shutil.copyfileobj(fin, fout, COPY_BUFSIZE)
 
-def _as_fna_bytes(src: Path) -> bytes:
-    """
-    Read a FASTA file (.fa/.fna/.fasta or gzipped) and return raw bytes.
 
-    v0.1: no header rewriting; just bytes-in/bytes-out.
-    """
-    name = src.name.lower()
-    if name.endswith(".gz"):
-        return _decompress_gz_to_bytes(src)
-    return _read_bytes_from_plain(src)
+def _write_gz_from(src: Path, dst_gz: Path, threads: int = 1) -> None:
+    # dst_gz.parent (out/mags) is created once by prep_step, not per file.
+    with _open_fna_read(src, threads) as fin, gzip.open(dst_gz, "wb") as fout:
+        shutil.copyfileobj(fin, fout, COPY_BUFSIZE)
 
 
 def prep_step(
@@ -57,6 +62,7 @@ def prep_step(
     sequential_ids: bool = False,
     out_prefix: str = "MAG",
     pad: int = 4,
+    cpus: int = 1,
 ) -> None:
     """
     Prepare MAGs for downstream steps.
@@ -65,6 +71,8 @@ def prep_step(
       - copies MAG FASTAs into out/mags/
       - optionally assigns sequential IDs (MAG0001...) and writes gzipped files
       - writes a mapping file (id_map.tsv) and a prep_report.json
+
+    Files are decompressed/copied using up to `cpus` threads.
     """
     out.mkdir(parents=True, exist_ok=True)
 
@@ -86,21 +94,15 @@ def prep_step(
     if rename_map is not None and sequential_ids:
         raise ValueError("--rename-map cannot be used together with --sequential-ids in v0.1")
 
-    # Write mapping header
-    map_lines = ["original_filename\tnew_id"]
-
-    copies: list[dict[str, str]] = []
+    # Decide every destination up front (sequential IDs depend on input order),
+    # then do the per-file decompress/copy work in parallel.
+    plan: list[tuple[Path, Path, str]] = []
+    writes: dict[Path, tuple[Path, Path, str]] = {}  # dst -> the input that ends up there
     i = 1
     for src in files:
-        original = src.name
-
         if sequential_ids:
             new_id = f"{out_prefix}{i:0{pad}d}"
             dst = out_mags / f"{new_id}_genomic.fna.gz"
-            data = _as_fna_bytes(src)
-            if dst.exists() and not force:
-                raise FileExistsError(f"Destination exists: {dst} (use --force)")
-            _write_gz_bytes(dst, data)
         else:
             # Preserve ID (stem) and standardise suffix to .fna (not gz) for simplicity
             # You can change this to always .fna.gz if you prefer.
@@ -116,17 +118,38 @@ def prep_step(
                         break
 
             dst = out_mags / f"{new_id}.fna"
-            if dst.exists() and not force:
-                raise FileExistsError(f"Destination exists: {dst} (use --force)")
-            # Just copy bytes (decompress if needed)
-            data = _as_fna_bytes(src)
-            dst.write_bytes(data)
 
-        map_lines.append(f"{original}\t{new_id}")
-        copies.append({"src": str(src), "dest": str(dst), "new_id": new_id})
+        # Two inputs can map to the same destination (A.fa and A.fna.gz -> A.fna): treat an
+        # earlier planned write like an existing file, so it is never written concurrently.
+        if (dst in writes or dst.exists()) and not force:
+            raise FileExistsError(f"Destination exists: {dst} (use --force)")
+        plan.append((src, dst, new_id))
+        # With --force the later input wins, as it would when copying one file at a time.
+        writes[dst] = (src, dst, new_id)
         i += 1
 
-    map_fp.write_text("\n".join(map_lines) + "\n", encoding="utf-8")
+    def _prep_one(item: tuple[Path, Path, str]) -> None:
+        src, dst, _ = item
+        # Replace rather than rewrite: later steps may hardlink these files (taxonomy's
+        # split dirs), and opening dst with "wb" would change those copies too.
+        dst.unlink(missing_ok=True)
+        if sequential_ids:
+            _write_gz_from(src, dst, threads)
+        elif src.name.lower().endswith(".gz"):
+            # Just copy bytes (decompress if needed)
+            _decompress_to(src, dst, threads)
+        else:
+            fastcopy(src, dst, metadata=False)
+
+    # gzip inflate/deflate and file copies release the GIL, so threads scale here.
+    # With fewer files than cpus, the spare threads go to decompressing each file.
+    threads = max(1, cpus // len(writes))
+    with ThreadPoolExecutor(max_workers=cpus) as ex:
+        list(ex.map(_prep_one, writes.values()))
+
+    with map_fp.open("w", encoding="utf-8") as fh:
+        fh.write("original_filename\tnew_id\n")
+        fh.writelines(f"{src.name}\t{new_id}\n" for src, _, new_id in plan)
 
     report = {
         "mags_dir": str(mags),
@@ -140,6 +163,11 @@ def prep_step(
             "id_map_tsv": str(map_fp),
             "prep_report_json": str(report_fp),
         },
-        "copies": copies,
+        "n_copied": len(plan),
     }
-    report_fp.write_text(json.dumps(report, indent=2), encoding="utf-8")
\ No newline at end of file
+    # The per-file listing duplicates id_map.tsv; only build it for debug runs.
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        report["copies"] = [
+            {"src": str(src), "dest": str(dst), "new_id": new_id} for src, dst, new_id in plan
+        ]
+    report_fp.write_bytes(dumps_json(report))
\ No newline at end of file
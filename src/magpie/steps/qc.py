@@ -1,21 +1,25 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 import csv
-import gzip
-import json
+import os
 import re
 import shutil
 from typing import Dict, Iterable, List, Optional, Tuple
 
+from magpie.util.io import COPY_BUFSIZE, fastcopy, link_or_copy, open_gz_read
+from magpie.util.json_fast import dumps as dumps_json
 from magpie.util.shell import run as shell_run
+from magpie.util.tsv import csv_field
 
 
 SEP_RE = re.compile(r"^\s*-{5,}\s*$")
 SPLIT_RE = re.compile(r"\s{2,}")  # CheckM QA tables align with >=2 spaces
 FASTA_EXTS = (".fa", ".fna", ".fasta")
 GZ_EXT = ".gz"
+_ALL_FASTA_EXTS = FASTA_EXTS + tuple(ext + GZ_EXT for ext in FASTA_EXTS)
 
 
 @dataclass(frozen=True)
@@ -32,22 +36,22 @@ def _ensure_dir(path: Path) -> None:
 
 def _strip_fasta_suffix(name: str) -> str:
     s = name.strip()
-    if s.lower().endswith(GZ_EXT):
+    low = s.lower()
+    if low.endswith(GZ_EXT):
         s = s[:-len(GZ_EXT)]
+        low = low[:-len(GZ_EXT)]
     for ext in FASTA_EXTS:
-        if s.lower().endswith(ext):
+        if low.endswith(ext):
             s = s[:-len(ext)]
             break
     return s
 
 
 def _iter_genome_files(dir_: Path) -> Iterable[Path]:
-    for p in dir_.iterdir():
-        if not p.is_file():
-            continue
-        low = p.name.lower()
-        if any(low.endswith(ext) for ext in FASTA_EXTS) or any(low.endswith(ext + GZ_EXT) for ext in FASTA_EXTS):
-            yield p
+    with os.scandir(dir_) as it:
+        for e in it:
+            if e.name.lower().endswith(_ALL_FASTA_EXTS) and e.is_file():
+                yield Path(e.path)
 
 
 def _read_domain_map(domain_map_tsv: Path) -> Dict[str, str]:
@@ -57,17 +61,19 @@ def _read_domain_map(domain_map_tsv: Path) -> Dict[str, str]:
     """
     domain_by_id: Dict[str, str] = {}
     with domain_map_tsv.open("r", newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh, delimiter="\t")
-        fields = reader.fieldnames or []
+        reader = csv.reader(fh, delimiter="\t")
+        fields = next(reader, [])
         genome_key = "genome_id" if "genome_id" in fields else ("Genome" if "Genome" in fields else None)
         domain_key = "domain" if "domain" in fields else ("Domain" if "Domain" in fields else None)
 
         if genome_key is None or domain_key is None:
             raise ValueError(f"domain_map.tsv missing expected columns. Found: {fields}")
 
+        gid_i = fields.index(genome_key)
+        dom_i = fields.index(domain_key)
         for row in reader:
-            gid = (row.get(genome_key) or "").strip()
-            dom = (row.get(domain_key) or "").strip()
+            gid = csv_field(row, gid_i).strip()
+            dom = csv_field(row, dom_i).strip()
             if gid:
                 domain_by_id[gid] = dom
     return domain_by_id
@@ -147,8 +153,8 @@ def parse_legacy_minimal_tsv(path: Path) -> List[CheckMRow]:
     """
     out: List[CheckMRow] = []
     with path.open("r", newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh, delimiter="\t")
-        fields = reader.fieldnames or []
+        reader = csv.reader(fh, delimiter="\t")
+        fields = next(reader, [])
 
         gid_key = "genome_id" if "genome_id" in fields else None
         c_key = "checkm_completeness" if "checkm_completeness" in fields else None
@@ -157,13 +163,16 @@ def parse_legacy_minimal_tsv(path: Path) -> List[CheckMRow]:
         if not (gid_key and c_key and t_key):
             raise ValueError(f"Legacy CheckM results TSV missing required columns. Found: {fields}")
 
+        gid_i = fields.index(gid_key)
+        c_i = fields.index(c_key)
+        t_i = fields.index(t_key)
         for row in reader:
-            gid = (row.get(gid_key) or "").strip()
+            gid = csv_field(row, gid_i).strip()
             if not gid:
                 continue
             try:
-                cpl = float((row.get(c_key) or "").strip())
-                cnt = float((row.get(t_key) or "").strip())
+                cpl = float(csv_field(row, c_i).strip())
+                cnt = float(csv_field(row, t_i).strip())
             except ValueError:
                 continue
 
@@ -195,8 +204,7 @@ def write_tsv(path: Path, header: List[str], rows: Iterable[List[str]]) -> None:
     with path.open("w", newline="", encoding="utf-8") as fh:
         w = csv.writer(fh, delimiter="\t")
         w.writerow(header)
-        for r in rows:
-            w.writerow(r)
+        w.writerows(rows)
 
 
 def place_bins(
@@ -236,12 +244,12 @@ def place_bins(
             elif mode == "hardlink":
                 dst.hardlink_to(src)
             elif mode == "copy":
-                shutil.copy2(src, dst)
+                fastcopy(src, dst)
             else:
                 raise ValueError(f"Unknown placement mode: {mode}")
         except OSError:
             if mode in ("symlink", "hardlink"):
-                shutil.copy2(src, dst)
+                fastcopy(src, dst)
             else:
                 raise
 
@@ -250,22 +258,35 @@ def place_bins(
     return placed, missing
 
 
-def _gunzip_or_copy_dir(src: Path, dst: Path) -> None:
+def _staged_fp(p: Path, dst: Path) -> Path:
+    if p.name.lower().endswith(GZ_EXT):
+        return dst / p.name[:-len(GZ_EXT)]
+    return dst / p.name
+
+
+def _gunzip_or_copy_one(p: Path, out_fp: Path, threads: int = 1) -> None:
+    if p.name.lower().endswith(GZ_EXT):
+        out_fp.unlink(missing_ok=True)  # may be a hardlink staged by an earlier run
+        with open_gz_read(p, threads) as fin, out_fp.open("wb") as fout:
+            shutil.copyfileobj(fin, fout, length=COPY_BUFSIZE)
+    else:
+        # CheckM only reads staged inputs, so a hardlink is as good as a copy.
+        link_or_copy(p, out_fp)
+
+
+def _gunzip_or_copy_dir(src: Path, dst: Path, cpus: int = 1) -> None:
     _ensure_dir(dst)
-    any_seen = False
-
-    for p in _iter_genome_files(src):
-        any_seen = True
-        if p.name.lower().endswith(GZ_EXT):
-            out_fp = dst / p.name[:-len(GZ_EXT)]
-            with gzip.open(p, "rb") as fin, out_fp.open("wb") as fout:
-                shutil.copyfileobj(fin, fout)
-        else:
-            shutil.copy2(p, dst / p.name)
-
-    if not any_seen:
+    files = sorted(_iter_genome_files(src))
+    if not files:
         raise ValueError(f"No FASTA files found in: {src}")
 
+    # X.fna and X.fna.gz stage to the same file: keep one job per output (the later,
+    # in sorted order) so two threads never write it at once.
+    jobs = {_staged_fp(p, dst): p for p in files}
+    threads = max(1, cpus // len(jobs))
+    with ThreadPoolExecutor(max_workers=cpus) as ex:
+        list(ex.map(lambda job: _gunzip_or_copy_one(job[1], job[0], threads), jobs.items()))
+
 
 def _run_checkm(
     *,
@@ -291,20 +312,26 @@ def _run_checkm(
     arc_files = list(_iter_genome_files(archaea_dir)) if archaea_dir.exists() else []
 
     if bac_files:
-        _gunzip_or_copy_dir(bacteria_dir, work_bac)
+        _gunzip_or_copy_dir(bacteria_dir, work_bac, cpus=cpus)
         out_bac = checkm_root / "bacteria"
         _ensure_dir(out_bac)
         ext = "fna" if list(work_bac.glob("*.fna")) else "fa"
-        shell_run([checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(work_bac), str(out_bac)])
+        shell_run(
+            [checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(work_bac), str(out_bac)],
+            log_fp=checkm_root / "lineage_wf.bacteria.log",
+        )
         qa_bac = out_bac / "checkm_qa.tsv"
         shell_run([checkm_bin, "qa", str(out_bac / "lineage.ms"), str(out_bac), "-o", "2", "-f", str(qa_bac)])
 
     if arc_files:
-        _gunzip_or_copy_dir(archaea_dir, work_arc)
+        _gunzip_or_copy_dir(archaea_dir, work_arc, cpus=cpus)
         out_arc = checkm_root / "archaea"
         _ensure_dir(out_arc)
         ext = "fna" if list(work_arc.glob("*.fna")) else "fa"
-        shell_run([checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(work_arc), str(out_arc)])
+        shell_run(
+            [checkm_bin, "lineage_wf", "-x", ext, "-t", str(cpus), str(work_arc), str(out_arc)],
+            log_fp=checkm_root / "lineage_wf.archaea.log",
+        )
         qa_arc = out_arc / "checkm_qa.tsv"
         shell_run([checkm_bin, "qa", str(out_arc / "lineage.ms"), str(out_arc), "-o", "2", "-f", str(qa_arc)])
 
@@ -426,40 +453,49 @@ def qc_step(
     write_tsv(
         out / "checkm_results.min.tsv",
         header=["genome_id", "checkm_completeness", "checkm_contamination"],
-        rows=[
+        rows=(
             [r.genome_id, f"{r.completeness:.2f}", f"{r.contamination:.2f}"]
             for (r, _) in merged
-        ],
+        ),
     )
 
     write_tsv(
         out_all,
         header=["genome_id", "marker_lineage", "checkm_completeness", "checkm_contamination", "domain"],
-        rows=[
+        rows=(
             [r.genome_id, r.marker_lineage, f"{r.completeness:.2f}", f"{r.contamination:.2f}", dom]
             for (r, dom) in merged
-        ],
+        ),
     )
 
-    kept = [
-        (r, dom) for (r, dom) in merged
-        if r.completeness >= completeness_min and r.contamination <= contamination_max
-    ]
+    # Filter and split by domain in one pass; IDs are already unique after dedup.
+    kept = []
+    bac_ids: List[str] = []
+    arc_ids: List[str] = []
+    for r, dom in merged:
+        if not (r.completeness >= completeness_min and r.contamination <= contamination_max):
+            continue
+        kept.append((r, dom))
+        dom_norm = dom[:4].lower()
+        if dom_norm == "bact":
+            bac_ids.append(r.genome_id)
+        elif dom_norm == "arch":
+            arc_ids.append(r.genome_id)
+    bac_ids.sort()
+    arc_ids.sort()
 
     write_tsv(
         out_filt,
         header=["genome_id", "marker_lineage", "checkm_completeness", "checkm_contamination", "domain"],
-        rows=[
+        rows=(
             [r.genome_id, r.marker_lineage, f"{r.completeness:.2f}", f"{r.contamination:.2f}", dom]
             for (r, dom) in kept
-        ],
+        ),
     )
 
-    bac_ids = sorted({r.genome_id for (r, dom) in kept if dom.lower().startswith("bact")})
-    arc_ids = sorted({r.genome_id for (r, dom) in kept if dom.lower().startswith("arch")})
-
-    (out / "bacteria.txt").write_text("\n".join(bac_ids) + ("\n" if bac_ids else ""), encoding="utf-8")
-    (out / "archaea.txt").write_text("\n".join(arc_ids) + ("\n" if arc_ids else ""), encoding="utf-8")
+    for list_fp, ids in ((out / "bacteria.txt", bac_ids), (out / "archaea.txt", arc_ids)):
+        with list_fp.open("w", encoding="utf-8") as fh:
+            fh.writelines(f"{gid}\n" for gid in ids)
 
     bins_root = out / "bins"
     placed_bac, miss_bac = place_bins(bac_ids, bacteria_dir, bins_root / "bacteria", mode=place_mode)
@@ -495,4 +531,4 @@ def qc_step(
         },
         "placement_mode": place_mode,
     }
-    (out / "report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
\ No newline at end of file
+    (out / "report.json").write_bytes(dumps_json(report))
\ No newline at end of file
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import csv
-import json
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+import errno
+from functools import lru_cache
+import os
+import re
 from pathlib import Path
 from typing import Final
 
+from ..util.io import COPY_BUFSIZE, fastcopy, link_or_copy
+from ..util.json_fast import dumps as dumps_json
+from ..util.tsv import csv_field
+
 SUMMARY_FILES: Final[tuple[str, str]] = (
     "gtdbtk.bac120.summary.tsv",
     "gtdbtk.ar53.summary.tsv",
@@ -23,6 +30,10 @@ SUFFIXES: Final[tuple[str, ...]] = (
     ".fasta",
 )
 
+# All SUFFIXES as one anchored alternation. The leftmost match wins, so a longer
+# suffix (e.g. _genomic.fna.gz) is always stripped in preference to its tail (.fna.gz).
+_SUFFIX_RE = re.compile("(?:" + "|".join(re.escape(suf) for suf in SUFFIXES) + r")\Z")
+
 
 def _strip_suffix(name: str) -> str:
     """
@@ -30,15 +41,12 @@ def _strip_suffix(name: str) -> str:
     (e.g. BC13.bin.1.603) as having a file extension.
     """
     s = str(name).strip()
-
-    # Remove known suffixes (for filenames)
-    for suf in SUFFIXES:
-        if s.endswith(suf):
-            return s[: -len(suf)]
-
-    # If none of the known FASTA suffixes matched, assume this is already an ID.
+    # Common case: no known suffix, so this is already an ID (one C-level endswith over the tuple).
     # Important: do NOT do Path(s).stem here, because it would truncate IDs with dots.
-    return s
+    if not s.endswith(SUFFIXES):
+        return s
+    # Remove known suffixes (for filenames)
+    return _SUFFIX_RE.sub("", s, count=1)
 
 
 def _infer_domain(classification: str | None) -> str:
@@ -63,84 +71,117 @@ def _read_id_map(id_map_fp: Path) -> dict[str, str]:
         raise FileNotFoundError(f"Expected id_map.tsv at: {id_map_fp}")
 
     with id_map_fp.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        if reader.fieldnames is None:
+        reader = csv.reader(f, delimiter="\t")
+        header = next(reader, None)
+        if header is None:
             raise ValueError(f"id_map.tsv has no header: {id_map_fp}")
 
-        cols = [c.strip().lower() for c in reader.fieldnames]
-        # map lowercase -> original
-        colmap = {c.strip().lower(): c for c in reader.fieldnames}
+        # map lowercase -> column index
+        colmap = {c.strip().lower(): i for i, c in enumerate(header)}
 
-        old_col = None
-        new_col = None
+        old_i = None
+        new_i = None
         for c in ("original_filename", "original", "raw_id", "old_id", "user_genome"):
-            if c in cols:
-                old_col = colmap[c]
+            if c in colmap:
+                old_i = colmap[c]
                 break
         for c in ("new_id", "formatted_id", "mag_id"):
-            if c in cols:
-                new_col = colmap[c]
+            if c in colmap:
+                new_i = colmap[c]
                 break
-        if old_col is None or new_col is None:
+        if old_i is None or new_i is None:
             raise ValueError(
-                f"id_map.tsv must have columns like original_filename/new_id. Found: {reader.fieldnames}"
+                f"id_map.tsv must have columns like original_filename/new_id. Found: {header}"
             )
 
+        # Plain rows with precomputed indices: no per-row dict as with DictReader.
         mapping: dict[str, str] = {}
         for row in reader:
-            old = _strip_suffix(str(row[old_col]).strip())
-            new = str(row[new_col]).strip()
+            old = _strip_suffix(csv_field(row, old_i))
+            new = csv_field(row, new_i).strip()
             if old and new:
                 mapping[old] = new
         return mapping
 
 
-def _read_gtdb_summaries(classify_dir: Path) -> dict[str, str]:
-    """
-    Read bac120 + ar53 summary TSVs from classify_dir.
-    Returns mapping user_genome -> classification (deduplicated).
-    """
+def _summary_signature(classify_dir: Path) -> tuple[tuple[int, int] | None, ...]:
+    """(mtime_ns, size) of each summary file, or None where it is absent."""
+    sig: list[tuple[int, int] | None] = []
+    for fn in SUMMARY_FILES:
+        try:
+            st = (classify_dir / fn).stat()
+        except FileNotFoundError:
+            sig.append(None)
+            continue
+        sig.append((st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+@lru_cache(maxsize=8)
+def _read_summaries_cached(
+    classify_dir: str, sig: tuple[tuple[int, int] | None, ...]
+) -> tuple[tuple[str, str], ...]:
+    # sig is only part of the cache key: a rewritten summary file invalidates the entry.
     result: dict[str, str] = {}
     for fn in SUMMARY_FILES:
-        fp = classify_dir / fn
+        fp = Path(classify_dir) / fn
         if not fp.exists():
             continue
         with fp.open("r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f, delimiter="\t")
-            if reader.fieldnames is None:
+            reader = csv.reader(f, delimiter="\t")
+            header = next(reader, None)
+            if header is None:
                 raise ValueError(f"Empty/invalid TSV: {fp}")
-            required = {"user_genome", "classification"}
-            if not required.issubset(set(reader.fieldnames)):
+            cols = {c: i for i, c in enumerate(header)}
+            if "user_genome" not in cols or "classification" not in cols:
                 raise ValueError(f"{fp} missing required columns: user_genome/classification")
+            ui = cols["user_genome"]
+            ci = cols["classification"]
 
             for row in reader:
-                ug = str(row["user_genome"]).strip()
-                cl = str(row["classification"]).strip()
+                ug = csv_field(row, ui).strip()
+                cl = csv_field(row, ci).strip()
                 if ug and ug not in result:
                     result[ug] = cl
+    return tuple(result.items())
+
+
+def _read_gtdb_summaries(classify_dir: Path) -> dict[str, str]:
+    """
+    Read bac120 + ar53 summary TSVs from classify_dir.
+    Returns mapping user_genome -> classification (deduplicated).
+
+    Parses are cached per directory while the summary files are unchanged (same
+    mtime and size), so repeated taxonomy runs on the same GTDB-Tk output skip re-reading.
+    """
+    result = dict(_read_summaries_cached(str(classify_dir.resolve()), _summary_signature(classify_dir)))
     if not result:
         raise FileNotFoundError(f"No GTDB-Tk summaries read from: {classify_dir}")
     return result
 
 
-def _find_prepped_genome(prep_mags_dir: Path, genome_id: str) -> Path | None:
-    """
-    Find a genome file in prep_mags_dir that corresponds to genome_id.
-    We try genome_id + known suffix patterns.
-    """
-    candidates = []
-    # Most likely in MAGPIE rename-default:
-    candidates.append(prep_mags_dir / f"{genome_id}_genomic.fna.gz")
-    candidates.append(prep_mags_dir / f"{genome_id}_genomic.fna")
+def clear_caches() -> None:
+    """Forget cached GTDB-Tk summary parses."""
+    _read_summaries_cached.cache_clear()
 
-    # Fallback generic suffixes
-    for suf in SUFFIXES:
-        candidates.append(prep_mags_dir / f"{genome_id}{suf}")
 
-    for p in candidates:
-        if p.exists():
-            return p
-    return None
+def _index_prepped_genomes(prep_mags_dir: Path) -> dict[str, Path]:
+    """
+    Map genome_id -> file for every genome in prep_mags_dir, from a single directory scan.
+    A file is indexed under each known suffix it ends with (X_genomic.fna.gz is both
+    "X" and "X_genomic"); when several files share an ID, the earlier SUFFIXES entry wins.
+    """
+    best: dict[str, tuple[int, Path]] = {}
+    with os.scandir(prep_mags_dir) as it:
+        for e in it:
+            if not e.name.endswith(SUFFIXES) or not e.is_file():
+                continue
+            for rank, suf in enumerate(SUFFIXES):
+                if e.name.endswith(suf):
+                    gid = e.name[: -len(suf)]
+                    if gid not in best or rank < best[gid][0]:
+                        best[gid] = (rank, Path(e.path))
+    return {gid: p for gid, (_, p) in best.items()}
 
 
 def taxonomy_step(
@@ -150,6 +191,7 @@ def taxonomy_step(
     out: Path,
     force: bool,
     move_files: bool = False,
+    cpus: int = 1,
 ) -> None:
     """
     Infer domain taxonomy from GTDB-Tk summaries and split prepared genomes by domain.
@@ -158,6 +200,7 @@ def taxonomy_step(
       - prep_dir: MAGPIE prep output directory (expects prep_dir/mags and prep_dir/id_map.tsv)
       - classify_dir: GTDB-Tk classify directory containing summary files
       - out: output directory for taxonomy artefacts and split genomes
+      - cpus: number of threads used to place genome files
 
     Outputs (in out/):
       - domain_map.tsv (id <tab> domain)
@@ -212,32 +255,32 @@ def taxonomy_step(
     if domain_map_fp.exists() and not force:
         raise FileExistsError(f"{domain_map_fp} exists. Use --force to overwrite.")
 
-    with domain_map_fp.open("w", encoding="utf-8", newline="") as f:
+    with domain_map_fp.open("w", encoding="utf-8", newline="", buffering=COPY_BUFSIZE) as f:
         w = csv.writer(f, delimiter="\t")
         w.writerow(["genome_id", "domain"])
-        for gid in sorted(domain_by_id):
-            w.writerow([gid, domain_by_id[gid]])
+        w.writerows((gid, domain_by_id[gid]) for gid in sorted(domain_by_id))
 
-    # Copy/move genomes into bacteria/archaea
-    moved_or_copied = 0
+    # Copy/move genomes into bacteria/archaea: resolve every source/destination first,
+    # then place them in parallel (link/copy/rename syscalls release the GIL).
     missing: list[str] = []
+    plan: dict[Path, Path] = {}  # dst -> src; one entry per destination file
+    placed_names: dict[Path, list[str]] = {bac_dir: [], arc_dir: []}
 
+    prepped_by_id = _index_prepped_genomes(prep_mags_dir)
     for gid, dom in domain_by_id.items():
-        src = _find_prepped_genome(prep_mags_dir, gid)
+        src = prepped_by_id.get(gid)
         if src is None:
             missing.append(gid)
             continue
         dst_dir = bac_dir if dom == "Bacteria" else arc_dir
         dst = dst_dir / src.name
+        if dst in plan:
+            continue
 
         if dst.exists() and not force:
             raise FileExistsError(f"{dst} exists. Use --force to overwrite.")
-
-        if move_files:
-            shutil.move(str(src), str(dst))
-        else:
-            shutil.copy2(str(src), str(dst))
-        moved_or_copied += 1
+        plan[dst] = src
+        placed_names[dst_dir].append(src.name)
 
     if missing:
         raise FileNotFoundError(
@@ -245,12 +288,29 @@ def taxonomy_step(
             f"Examples: {missing[:10]}"
         )
 
-    # Regenerate lists from actual split dirs (guarantees consistency)
+    def place_one(item: tuple[Path, Path]) -> None:
+        dst, src = item
+        if move_files:
+            try:
+                os.replace(src, dst)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Cross-device: copy then remove, as shutil.move would.
+                fastcopy(src, dst)
+                src.unlink()
+        else:
+            # Downstream steps only read the split genomes: hardlink/reflink rather than copy.
+            link_or_copy(src, dst)
+
+    with ThreadPoolExecutor(max_workers=cpus) as ex:
+        list(ex.map(place_one, plan.items()))
+    moved_or_copied = len(plan)
+
+    # Lists come from the files just placed (in filename order), no need to rescan the split dirs.
     def write_id_list(dir_path: Path, out_fp: Path) -> None:
-        ids = []
-        for fn in sorted(p.name for p in dir_path.iterdir() if p.is_file() and not p.name.startswith(".")):
-            ids.append(_strip_suffix(fn))
-        out_fp.write_text("\n".join(ids) + ("\n" if ids else ""), encoding="utf-8")
+        with out_fp.open("w", encoding="utf-8") as fh:
+            fh.writelines(f"{_strip_suffix(fn)}\n" for fn in sorted(placed_names[dir_path]))
 
     bac_list_fp = genome_dir / "bacteria.txt"
     arc_list_fp = genome_dir / "archaea.txt"
@@ -275,4 +335,4 @@ def taxonomy_step(
         },
         "n_split_genomes": moved_or_copied,
     }
-    report_fp.write_text(json.dumps(report, indent=2), encoding="utf-8")
\ No newline at end of file
+    report_fp.write_bytes(dumps_json(report))
\ No newline at end of file
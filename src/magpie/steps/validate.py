@@ -1,11 +1,12 @@
 # src/magpie/steps/validate.py
 from __future__ import annotations
 
-from collections import Counter
-import json
+from collections import defaultdict
+import os
 from pathlib import Path
 
 from ..util.deps import check_gtdbtk, check_checkm
+from ..util.json_fast import dumps as dumps_json
 
 FASTA_SUFFIXES = (".fa", ".fna", ".fasta", ".fa.gz", ".fna.gz", ".fasta.gz")
 
@@ -23,36 +24,52 @@ def validate_step(
     if report_fp.exists() and not force:
         raise FileExistsError(f"{report_fp} exists. Use --force to overwrite.")
 
-    # Accept plain + gz FASTA
-    def is_fasta(p: Path) -> bool:
-        name = p.name.lower()
-        return any(name.endswith(s) for s in FASTA_SUFFIXES)
-
-    fasta_files = sorted([p for p in mags.iterdir() if p.is_file() and is_fasta(p)])
-    if not fasta_files:
+    # Accept plain + gz FASTA. os.scandir gives the file type from the directory listing
+    # and caches stat() per entry; names are unique, so the tuples sort by name.
+    with os.scandir(mags) as it:
+        entries = sorted(
+            (e.name, lower, e)
+            for e in it
+            if (lower := e.name.lower()).endswith(FASTA_SUFFIXES) and e.is_file()
+        )
+    if not entries:
         raise ValueError(f"No FASTA files found in: {mags}")
 
     # Genome IDs are derived from basename (same logic as earlier; quick/cheap check)
     # Note: For *.fa.gz, .stem removes only .gz; we normalise by stripping second suffix too.
-    def genome_id(p: Path) -> str:
-        name = p.name
-        lower = name.lower()
+    def genome_id(name: str, lower: str) -> str:
         if lower.endswith(".gz"):
             base = name[:-3]  # drop ".gz"
             for suff in (".fa", ".fna", ".fasta"):
-                if base.lower().endswith(suff):
+                if lower[:-3].endswith(suff):
                     return base[: -len(suff)]
-            return Path(base).stem
-        return p.stem
+            return os.path.splitext(base)[0]
+        return os.path.splitext(name)[0]
 
-    names = [genome_id(p) for p in fasta_files]
-    dupes = sorted([n for n, c in Counter(names).items() if c > 1])
-    empty = [str(p) for p in fasta_files if p.stat().st_size == 0]
-    suffix_counts = dict(Counter([(".gz" if p.name.lower().endswith(".gz") else p.suffix.lower()) for p in fasta_files]))
+    # One pass fills every per-file output. The report keeps the scandir path strings as-is.
+    fasta_paths: list[str] = []
+    empty: list[str] = []
+    seen: set[str] = set()
+    dupe_set: set[str] = set()
+    suffix_counts: defaultdict[str, int] = defaultdict(int)
+    for name, lower, e in entries:
+        fasta_paths.append(e.path)
+        gid = genome_id(name, lower)
+        # Only duplicates matter here, so track membership instead of counting.
+        if gid in seen:
+            dupe_set.add(gid)
+        else:
+            seen.add(gid)
+        if e.stat().st_size == 0:
+            empty.append(e.path)
+        # Every kept name ends in a known suffix, so its last extension is the category.
+        suffix_counts[lower[lower.rfind("."):]] += 1
+    dupes = sorted(dupe_set)
 
     # Dependency checks
-    gtdb = check_gtdbtk()
-    checkm = check_checkm()
+    # Only probe versions for tools the caller requires; presence is enough otherwise.
+    gtdb = check_gtdbtk(detect_version=require_gtdbtk)
+    checkm = check_checkm(detect_version=require_checkm)
 
     dependencies = {
         "gtdbtk": {
@@ -85,13 +102,13 @@ def validate_step(
 
     report = {
         "mags_dir": str(mags),
-        "n_fastas": len(fasta_files),
-        "fastas": [str(p) for p in fasta_files],
-        "suffix_counts": suffix_counts,
+        "n_fastas": len(fasta_paths),
+        "fastas": fasta_paths,
+        "suffix_counts": dict(suffix_counts),
         "duplicates": dupes,
         "empty_files": empty,
         "dependencies": dependencies,
         "require_gtdbtk": require_gtdbtk,
         "require_checkm": require_checkm,
     }
-    report_fp.write_text(json.dumps(report, indent=2), encoding="utf-8")
\ No newline at end of file
+    report_fp.write_bytes(dumps_json(report))
\ No newline at end of file
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+import os
 import shutil
 import subprocess
 from typing import Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DepCheck:
     found: bool
     path: Optional[str]
@@ -17,7 +19,12 @@ class DepCheck:
 
 def _run_version(cmd: list[str]) -> tuple[Optional[str], Optional[str]]:
     try:
-        p = subprocess.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        # close_fds=False (safe: Python fds are non-inheritable by default, PEP 446) and an
+        # absolute executable let CPython spawn via posix_spawn instead of fork+exec; adding
+        # cwd=, pass_fds=, preexec_fn= or start_new_session= would disable that fast path.
+        p = subprocess.run(
+            cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=False
+        )
     except Exception as e:
         return None, str(e)
     out = (p.stdout or "").strip()
@@ -29,20 +36,44 @@ def _run_version(cmd: list[str]) -> tuple[Optional[str], Optional[str]]:
     return txt.splitlines()[0] if txt else None, None
 
 
-def check_gtdbtk() -> DepCheck:
+# PATH lookups and version probes are memoised: validate and later steps check the same tools.
+# Keys include PATH / the resolved executable, so a changed environment is looked up afresh.
+@lru_cache(maxsize=32)
+def _which(exe: str, path_env: Optional[str]) -> Optional[str]:
+    return shutil.which(exe, path=path_env)
+
+
+@lru_cache(maxsize=32)
+def _cached_version(cmd: tuple[str, ...]) -> tuple[Optional[str], Optional[str]]:
+    return _run_version(list(cmd))
+
+
+def clear_caches() -> None:
+    """Forget memoised PATH lookups and tool versions."""
+    _which.cache_clear()
+    _cached_version.cache_clear()
+
+
+def check_gtdbtk(*, detect_version: bool = True) -> DepCheck:
     exe = "gtdbtk"
-    path = shutil.which(exe)
+    path = _which(exe, os.environ.get("PATH"))
     if not path:
         return DepCheck(found=False, path=None, version=None, error="not found on PATH")
-    version, err = _run_version([exe, "--version"])
+    if not detect_version:
+        # Presence is all the caller needs; skip spawning the tool.
+        return DepCheck(found=True, path=path, version=None, error=None)
+    version, err = _cached_version((path, "--version"))
     return DepCheck(found=True, path=path, version=version, error=err)
 
 
-def check_checkm() -> DepCheck:
+def check_checkm(*, detect_version: bool = True) -> DepCheck:
     exe = "checkm"
-    path = shutil.which(exe)
+    path = _which(exe, os.environ.get("PATH"))
     if not path:
         return DepCheck(found=False, path=None, version=None, error="not found on PATH")
+    if not detect_version:
+        # Presence is all the caller needs; skip spawning the tool.
+        return DepCheck(found=True, path=path, version=None, error=None)
     # CheckM supports '--version' in many installs; if it fails, we still mark found=True.
-    version, err = _run_version([exe, "--version"])
+    version, err = _cached_version((path, "--version"))
     return DepCheck(found=True, path=path, version=version, error=err)
\ No newline at end of file
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import errno
+import gzip
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+# Optional: ISA-L (python-isal) provides a drop-in, much faster gzip decompressor.
+try:
+    from isal import igzip as _igzip
+except ImportError:
+    _igzip = None
+
+# Optional: rapidgzip decodes a single gzip stream on several threads.
+try:
+    import rapidgzip as _rapidgzip
+except ImportError:
+    _rapidgzip = None
+
+# Buffer size for streaming copies/decompression (the shutil default is 64 KiB or less).
+COPY_BUFSIZE = 1024 * 1024
+
+# rapidgzip's chunk prefetcher only pays for itself on larger archives.
+PARALLEL_GZ_MIN_BYTES = 64 * 1024 * 1024
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)): share the source's extents on btrfs/XFS.
+_FICLONE = 0x40049409
+
+# copy_file_range errors that just mean "not supported here"; we fall back to shutil.
+_COPY_RANGE_FALLBACK_ERRNOS = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+)
+
+
+def open_gz_read(path: Path, threads: int = 1) -> BinaryIO:
+    """
+    Open a gzip file for binary reading, using ISA-L when it is installed.
+
+    With threads > 1, archives of at least PARALLEL_GZ_MIN_BYTES are decoded in
+    parallel by rapidgzip when it is installed.
+    """
+    if threads > 1 and _rapidgzip is not None and path.stat().st_size >= PARALLEL_GZ_MIN_BYTES:
+        return _rapidgzip.open(str(path), parallelization=threads)
+    if _igzip is not None:
+        return _igzip.open(path, "rb")
+    return gzip.open(path, "rb")
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    """
+    Clone file contents with FICLONE, else copy them with os.copy_file_range (in-kernel).
+    Returns False if the call is unavailable or unsupported for these files, or if it
+    copied nothing or fewer bytes than src holds (procfs, some FUSE/network mounts and
+    older kernels report 0 instead of failing).
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        return False
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+                    return True
+                except OSError:
+                    pass  # no reflink support here; copy the data in-kernel instead
+            size = os.fstat(fin.fileno()).st_size
+            copied = 0
+            while True:
+                n = copy_file_range(fin.fileno(), fout.fileno(), 1 << 30)
+                if not n:
+                    break
+                copied += n
+            if not copied or copied < size:
+                return False  # the caller's shutil.copyfile rewrites dst from scratch
+    except OSError as e:
+        if e.errno in _COPY_RANGE_FALLBACK_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def fastcopy(src: Path, dst: Path, *, metadata: bool = True) -> None:
+    """
+    Copy src to dst without moving the bytes through Python where possible.
+
+    Tries a FICLONE reflink / os.copy_file_range first, then shutil.copyfile
+    (which itself uses sendfile on Linux). With metadata=True this behaves like shutil.copy2.
+    """
+    if not _copy_file_range(src, dst):
+        shutil.copyfile(src, dst)
+    if metadata:
+        shutil.copystat(src, dst)
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Hardlink src to dst (no data copied), falling back to fastcopy when linking
+    is not possible (e.g. across filesystems). Only for consumers that treat dst
+    as read-only. An existing dst is removed first: writing through a previous
+    hardlink would truncate src.
+    """
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        fastcopy(src, dst)
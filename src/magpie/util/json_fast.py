@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Optional: orjson (a C extension) serialises large reports several times faster.
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialise obj as 2-space-indented JSON (UTF-8 bytes), using orjson when it is installed.
+    """
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
@@ -26,20 +26,40 @@ def run_cmd(
     *,
     cwd: Path | None = None,
     env: dict[str, str] | None = None,
+    capture: bool = True,
+    log_fp: Path | None = None,
 ) -> None:
     """
     Execute a shell command and raise ShellError if it fails.
+
+    By default stdout/stderr are captured in memory for the error message. With
+    log_fp, both streams go straight to that file instead; with capture=False
+    (and no log_fp) the child inherits our stdout/stderr. Either way, output from
+    long-running tools is never held in Python memory.
     """
+    cmd = list(cmd)
+    cwd_s = str(cwd) if cwd else None
+    if log_fp is not None:
+        with log_fp.open("wb") as log:
+            p = subprocess.run(cmd, cwd=cwd_s, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if p.returncode != 0:
+            raise ShellError(cmd, p.returncode, "", f"(output written to {log_fp})")
+        return
+    if not capture:
+        p = subprocess.run(cmd, cwd=cwd_s, env=env)
+        if p.returncode != 0:
+            raise ShellError(cmd, p.returncode, "", "")
+        return
     p = subprocess.run(
-        list(cmd),
-        cwd=str(cwd) if cwd else None,
+        cmd,
+        cwd=cwd_s,
         env=env,
         text=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
     if p.returncode != 0:
-        raise ShellError(list(cmd), p.returncode, p.stdout, p.stderr)
+        raise ShellError(cmd, p.returncode, p.stdout, p.stderr)
 
 
 def run(
@@ -47,9 +67,11 @@ def run(
     *,
     cwd: Path | None = None,
     env: dict[str, str] | None = None,
+    capture: bool = True,
+    log_fp: Path | None = None,
 ) -> None:
     """
     Compatibility wrapper used by MAGPIE steps.
     Allows importing `run` while keeping the original run_cmd implementation.
     """
-    run_cmd(cmd, cwd=cwd, env=env)
\ No newline at end of file
+    run_cmd(cmd, cwd=cwd, env=env, capture=capture, log_fp=log_fp)
\ No newline at end of file
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def csv_field(row: Sequence[str], i: int) -> str:
+    """Column i of a csv.reader row, or "" if the row is short (as DictReader would give)."""
+    return row[i] if i < len(row) else ""